@@ -1,5 +1,8 @@
-import re, requests, feedparser
+import re, time, bisect, itertools, requests, feedparser
 from bs4 import BeautifulSoup
+from dataclasses import dataclass
+from typing import Callable, Dict, List
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
 HEADERS = {"User-Agent":"Mozilla/5.0"}
 URL_CHEAP_BY_RATING = "https://www.futbin.com/players?version=all&sort=PricePS"
@@ -10,12 +13,31 @@ KEYWORDS_LEAK = re.compile(r"(sbc|upgrade|repeatable|player pick|party bag|totw|
 def _get(url, timeout=15):
     return requests.get(url, headers=HEADERS, timeout=timeout)
 
+@dataclass
+class Scanner:
+    name: str
+    func: Callable[[], List[dict]]
+    timeout: float = 20.0   # prazo em segundos; depois disso o scanner é dado como atrasado
+    priority: int = 0       # maior = aparece primeiro em empate de confiança
+
+SCANNERS: Dict[str, Scanner] = {}
+CONFIDENCE_RANK = {"alta": 0, "média": 1, "baixa": 2}
+_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="scanner")
+
+def register_scanner(name, timeout=20.0, priority=0):
+    """Decorator: regista uma função que devolve [{type, msg, confidence}] como scanner."""
+    def deco(fn):
+        SCANNERS[name] = Scanner(name, fn, timeout, priority)
+        return fn
+    return deco
+
 def _parse_price(txt):
     import re
     try: return int(re.sub(r"[^\d]","", txt))
     except: return None
 
-def scan_futbin():
+@register_scanner("futbin_fodder", timeout=20, priority=2)
+def scan_futbin_fodder():
     signals=[]
     try:
         r=_get(URL_CHEAP_BY_RATING)
@@ -44,6 +66,11 @@ def scan_futbin():
                     signals.append({"type":"FODDER","msg":f"Fodder 83 a aquecer (média ~{int(avg):,}). Snipes < {int(avg*0.9):,} | Flip ~ {int(avg*1.15):,}","confidence":"média"})
     except Exception as e:
         signals.append({"type":"INFO","msg":f"[Futbin] erro: {e}","confidence":"baixa"})
+    return signals
+
+@register_scanner("futbin_sbc", timeout=20, priority=1)
+def scan_futbin_sbc():
+    signals=[]
     try:
         r=_get(URL_SBC_LATEST)
         soup=BeautifulSoup(r.text,"lxml")
@@ -55,10 +82,13 @@ def scan_futbin():
         signals.append({"type":"INFO","msg":f"[Futbin SBC] erro: {e}","confidence":"baixa"})
     return signals
 
+@register_scanner("futsheriff", timeout=15, priority=3)
 def scan_futsheriff():
     signals=[]
     try:
-        feed=feedparser.parse(NITTER_RSS)
+        # o feedparser não tem timeout de rede: descarregamos nós, dentro do prazo do scanner
+        r=_get(NITTER_RSS, timeout=10)
+        feed=feedparser.parse(r.content)
         for e in feed.entries[:10]:
             title=e.get("title","")
             if KEYWORDS_LEAK.search(title):
@@ -68,8 +98,44 @@ def scan_futsheriff():
         signals.append({"type":"INFO","msg":f"[FutSheriff] erro: {e}","confidence":"baixa"})
     return signals
 
-def run_scan():
-    out=[]
-    for s in (scan_futbin()+scan_futsheriff()):
-        out.append(f"【{s.get('type','INFO')} | conf. {s.get('confidence','-')}】 {s['msg']}")
+def scan_cycle():
+    """
+    Corre todos os scanners registados em paralelo. Os sinais são ordenados à medida
+    que cada scanner termina (confiança, depois prioridade do scanner). Um scanner que
+    passe o seu prazo é reportado como atrasado e não bloqueia o ciclo, logo a duração
+    total é ~max(scanner) e não a soma.
+    """
+    start=time.monotonic()
+    pending={_pool.submit(sc.func):sc for sc in SCANNERS.values()}
+    ranked=[]; late=[]; seq=itertools.count()
+    def add(sig, sc):
+        sig.setdefault("source", sc.name)
+        key=(CONFIDENCE_RANK.get(sig.get("confidence"),3), -sc.priority, next(seq))
+        bisect.insort(ranked, (key, sig))
+    while pending:
+        elapsed=time.monotonic()-start
+        next_deadline=min(sc.timeout for sc in pending.values())
+        done,_=wait(pending, timeout=max(0.0, next_deadline-elapsed), return_when=FIRST_COMPLETED)
+        for f in done:
+            sc=pending.pop(f)
+            try:
+                sigs=f.result()
+            except Exception as e:
+                sigs=[{"type":"INFO","msg":f"[{sc.name}] erro: {e}","confidence":"baixa"}]
+            for sig in sigs:
+                add(sig, sc)
+        elapsed=time.monotonic()-start
+        for f,sc in list(pending.items()):
+            if elapsed>=sc.timeout:
+                # não dá para interromper a thread; o resultado tardio é simplesmente ignorado
+                pending.pop(f); f.cancel(); late.append(sc.name)
+                add({"type":"INFO","msg":f"[{sc.name}] atrasado (> {sc.timeout:g}s), ignorado neste ciclo","confidence":"baixa"}, sc)
+    return {"signals":[sig for _,sig in ranked], "late":late, "elapsed":round(time.monotonic()-start,2)}
+
+def format_signal(s):
+    return f"【{s.get('type','INFO')} | conf. {s.get('confidence','-')}】 {s['msg']}"
+
+def run_scan(cycle=None):
+    cycle=cycle or scan_cycle()
+    out=[format_signal(s) for s in cycle["signals"]]
     return out or ["Sem sinais fortes agora. A monitorizar…"]
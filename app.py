@@ -6,7 +6,7 @@ from typing import Dict, Any, List, Optional
 
 import httpx
 from fastapi import FastAPI, Request, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 
 SERVICE_NAME = "EA Trader AI – Analyst"
 
@@ -20,6 +20,18 @@ try:
 except Exception:
     futbin_login_and_check = None
 
+try:
+    from sbc import solve_sbc, format_solution, MIN_TARGET as SBC_MIN, MAX_TARGET as SBC_MAX
+except Exception:
+    solve_sbc = None
+
+try:
+    from catalog import get_catalog
+except Exception:
+    get_catalog = None
+
+from snapshots import SIGNALS, FODDER, HYPE, PLAYERS, Snapshot, etag_matches, refresh_all
+
 app = FastAPI(title=SERVICE_NAME, version="1.0.0")
 http = httpx.AsyncClient(timeout=30.0)
 
@@ -72,14 +84,29 @@ async def tg_set_webhook() -> Dict[str, Any]:
 
 
 async def fetch_market_snapshot() -> Dict[str, Any]:
+    # usa o último ciclo pré-calculado (não faz scrapes próprios)
+    await FODDER.get()
+    await SIGNALS.get()
+    ch24 = (FODDER.data or {}).get("change_24h") or {}
+    moves = [f"{r}: {c:+.1f}%" for r, c in sorted(ch24.items()) if abs(c) > 2]
+    # só sinais reais contam como oportunidade (INFO = erros/avisos dos scanners)
+    signals = [s for s in (SIGNALS.data or {}).get("signals") or [] if s.get("type") != "INFO"]
     return {
         "timestamp": datetime.utcnow().isoformat() + "Z",
-        "summary": "Mercado está estável; sem desvios > ±2% nas últimas 24h.",
-        "top_opportunity": None,
+        "summary": ("Fodder 24h – " + ", ".join(moves)) if moves
+        else "Mercado está estável; sem desvios > ±2% nas últimas 24h.",
+        "top_opportunity": signals[0]["msg"] if signals else None,
     }
 
 
 async def analyze_and_broadcast():
+    # pré-calcula os snapshots servidos por /signals, /fodder e /hype
+    # (e atualiza os detetores de fodder e de jogadores)
+    await refresh_all()
+    # só alertas da leitura deste ciclo (se o refresh falhou, .data é o ciclo anterior)
+    anomalies = [a for snap in (FODDER, PLAYERS) if snap.error is None
+                 for a in (snap.data or {}).get("anomalies") or []]
+
     subs = _load_subscribers()
     if not subs:
         return
@@ -91,6 +118,8 @@ async def analyze_and_broadcast():
         f"Resumo: {snapshot['summary']}\n"
         f"Oportunidade: {snapshot['top_opportunity'] or '—'}"
     )
+    for a in anomalies:
+        txt += f"\n⚠️ {a['msg']}"
     await asyncio.gather(*(tg_send_message(cid, txt, True) for cid in subs))
 
 
@@ -153,6 +182,74 @@ async def futbin_test():
     return JSONResponse(status_code=status_code, content=result)
 
 
+async def _solve_sbc_live(rating: int) -> Dict[str, Any]:
+    await FODDER.get()
+    prices = (FODDER.data or {}).get("prices")
+    if not prices:
+        return {"ok": False, "target": rating, "detail": "Preços de fodder indisponíveis."}
+    return solve_sbc(prices, rating)
+
+
+async def _serve_snapshot(snap: Snapshot, request: Request) -> Response:
+    body, etag = await snap.get()
+    if body is None:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Sem dados para '{snap.name}': {snap.error or 'a calcular'}",
+            headers={"Retry-After": str(int(snap.retry_in()) or 1)},
+        )
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@app.get("/signals", tags=["snapshots"])
+async def signals_snapshot(request: Request):
+    return await _serve_snapshot(SIGNALS, request)
+
+
+@app.get("/fodder", tags=["snapshots"])
+async def fodder_snapshot(request: Request):
+    return await _serve_snapshot(FODDER, request)
+
+
+@app.get("/hype", tags=["snapshots"])
+async def hype_snapshot(request: Request):
+    return await _serve_snapshot(HYPE, request)
+
+
+@app.get("/sbc/{rating}", tags=["sbc"])
+async def sbc_cheapest(rating: int):
+    if solve_sbc is None:
+        raise HTTPException(status_code=500, detail="sbc.py/market.py não encontrados.")
+    if not (SBC_MIN <= rating <= SBC_MAX):
+        raise HTTPException(status_code=400, detail=f"Rating deve estar entre {SBC_MIN} e {SBC_MAX}.")
+    result = await _solve_sbc_live(rating)
+    return JSONResponse(status_code=200 if result.get("ok") else 502, content=result)
+
+
+@app.get("/players/search", tags=["players"])
+async def players_search(q: str, limit: int = 5):
+    if get_catalog is None:
+        raise HTTPException(status_code=500, detail="catalog.py não encontrado.")
+    return {"query": q, "results": get_catalog().search(q, limit=max(1, min(limit, 25)))}
+
+
+async def _price_by_name(name: str) -> str:
+    player = get_catalog().resolve(name)
+    if not player:
+        return f"🔎 Jogador não encontrado: {name}"
+    try:
+        from market_analyzer import fetch_player_price
+    except Exception:
+        return f"🔎 {player['name']} (id {player['id']}) – preço indisponível."
+    loop = asyncio.get_running_loop()
+    price = await loop.run_in_executor(None, fetch_player_price, player["id"])
+    shown = f"{price:,} moedas" if price else "N/D"
+    return f"💰 {player['name']} (id {player['id']}): {shown}"
+
+
 @app.post("/webhook/{token}", tags=["telegram"])
 async def tg_webhook(token: str, request: Request):
     if token != TELEGRAM_TOKEN:
@@ -167,6 +264,9 @@ async def tg_webhook(token: str, request: Request):
     if not chat_id or not text:
         return {"ok": True}
 
+    parts = text.split()
+    command = parts[0].split("@")[0].lower()
+
     if text.lower() in ("/start", "start"):
         subs = _load_subscribers()
         if chat_id not in subs:
@@ -181,7 +281,7 @@ async def tg_webhook(token: str, request: Request):
     if text.lower() in ("/help", "help"):
         await tg_send_message(
             chat_id,
-            "Comandos:\n/start – ativar e subscrever\n/help – ajuda\n/status – estado\n/subscribe – receber sinais\n/unsubscribe – parar sinais\n/signal – teste",
+            "Comandos:\n/start – ativar e subscrever\n/help – ajuda\n/status – estado\n/subscribe – receber sinais\n/unsubscribe – parar sinais\n/signal – teste\n/sbc <rating> – plantel SBC mais barato\n/price <nome> – preço de um jogador",
         )
         return {"ok": True}
 
@@ -210,13 +310,45 @@ async def tg_webhook(token: str, request: Request):
         await tg_send_message(chat_id, "📣 Sinal de teste: (apenas um exemplo).")
         return {"ok": True}
 
+    if command == "/sbc":
+        if solve_sbc is None:
+            await tg_send_message(chat_id, "⚠️ Solver de SBC indisponível.")
+        elif len(parts) < 2 or not parts[1].isdigit() or not (SBC_MIN <= int(parts[1]) <= SBC_MAX):
+            await tg_send_message(chat_id, f"Uso: /sbc <rating> (entre {SBC_MIN} e {SBC_MAX})")
+        else:
+            result = await _solve_sbc_live(int(parts[1]))
+            await tg_send_message(chat_id, format_solution(result))
+        return {"ok": True}
+
+    if command == "/price":
+        name = " ".join(parts[1:])
+        if get_catalog is None:
+            await tg_send_message(chat_id, "⚠️ Catálogo de jogadores indisponível.")
+        elif not name:
+            await tg_send_message(chat_id, "Uso: /price <nome do jogador>")
+        else:
+            await tg_send_message(chat_id, await _price_by_name(name))
+        return {"ok": True}
+
     await tg_send_message(chat_id, f"Recebi: {text}")
     return {"ok": True}
 
 
+# referência forte: o asyncio só guarda referências fracas às tasks
+_startup_refresh: Optional[asyncio.Task] = None
+
+
 @app.on_event("startup")
 async def on_startup():
     _start_scheduler()
+    if get_catalog is not None:
+        try:
+            print("Catálogo de jogadores:", len(get_catalog()), "entradas")
+        except Exception as e:
+            print("Falha ao carregar catálogo:", str(e))
+    # primeiro ciclo em background para /signals, /fodder e /hype terem dados cedo
+    global _startup_refresh
+    _startup_refresh = asyncio.get_running_loop().create_task(refresh_all())
     try:
         res = await tg_set_webhook()
         print("Webhook set result:", res)
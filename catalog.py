@@ -0,0 +1,339 @@
+# catalog.py
+# Catálogo local de jogadores (nome -> id Futbin) com índice compacto em disco,
+# carregado via mmap. Pesquisa por prefixo e fuzzy (trigramas), sem rede.
+
+import bisect
+import mmap
+import os
+import struct
+import sys
+import unicodedata
+from array import array
+from itertools import chain
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+CATALOG_FILE = os.getenv("PLAYER_CATALOG", "players.idx")
+MAGIC = b"EATCAT2\0"
+# magic, nº jogadores, nº trigramas, nº tokens, nº entradas de postings
+_HEADER = struct.Struct("<8sIIII")
+_U32 = struct.Struct("<I")
+_GRAM = struct.Struct("<12sII")   # trigrama (utf-8, padding \0), início e tamanho da posting list
+_TOKEN = struct.Struct("<IHH")    # jogador, início e tamanho do token dentro da chave
+# trigramas presentes em mais do que esta fração do catálogo não servem para filtrar
+COMMON_GRAM_FRACTION = 0.02
+# máximo de distâncias de edição calculadas por pesquisa (os candidatos mais prováveis primeiro)
+MAX_VERIFY = 25
+# letras sem decomposição NFKD ('Ødegaard' -> 'odegaard')
+_TRANSLIT = str.maketrans({"ø": "o", "æ": "ae", "œ": "oe", "ß": "ss", "đ": "d", "ł": "l", "ı": "i", "þ": "th"})
+
+
+def normalize(text: str) -> str:
+    """Minúsculas, sem acentos e só letras/dígitos/espaços: 'Vinícius Jr.' -> 'vinicius jr'."""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(ch for ch in text if not unicodedata.combining(ch)).lower().translate(_TRANSLIT)
+    text = "".join(ch if ch.isalnum() else " " for ch in text)
+    return " ".join(text.split())
+
+
+def _trigrams(key: str) -> set:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _record_grams(key: str) -> set:
+    """Trigramas da chave completa e de cada palavra (para casar a query com qualquer um)."""
+    grams = _trigrams(key)
+    for tok in key.split():
+        grams |= _trigrams(tok)
+    return grams
+
+
+def _edit_distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein restrito à faixa |i - j| <= limit; devolve limit + 1 se passar do limite."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    over = limit + 1
+    prev = [j if j <= limit else over for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        ca = a[i - 1]
+        lo, hi = max(1, i - limit), min(len(b), i + limit)
+        cur = [over] * (len(b) + 1)
+        cur[0] = i if i <= limit else over
+        best = cur[0]
+        for j in range(lo, hi + 1):
+            v = prev[j - 1] + (ca != b[j - 1])
+            if prev[j] + 1 < v:
+                v = prev[j] + 1
+            if cur[j - 1] + 1 < v:
+                v = cur[j - 1] + 1
+            cur[j] = v if v < over else over
+            if v < best:
+                best = v
+        if best > limit:
+            return over
+        prev = cur
+    return prev[-1]
+
+
+def _u32_array(values: List[int]) -> bytes:
+    arr = array("I", values)
+    if arr.itemsize != 4:
+        return b"".join(_U32.pack(v) for v in values)
+    if sys.byteorder == "big":
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def build_index(players: Iterable[Tuple[str, str]], path: str = CATALOG_FILE) -> int:
+    """
+    Escreve o índice completo, tudo lido depois por mmap sem parse:
+    cabeçalho | offsets dos registos (u32) | tabela de trigramas ordenada |
+    tabela de tokens ordenada | postings (u32, ordenadas por jogador) |
+    registos 'chave\\0nome\\0id\\0' ordenados pela chave normalizada.
+    Devolve o nº de jogadores.
+    """
+    rows = sorted({(normalize(name), name, str(pid)) for pid, name in players if normalize(name)},
+                  key=lambda r: (r[0].encode("utf-8"), r[1], r[2]))
+    records = [f"{k}\0{n}\0{i}\0".encode("utf-8") for k, n, i in rows]
+    offsets, pos = [], 0
+    for rec in records:
+        offsets.append(pos)
+        pos += len(rec)
+
+    postings: Dict[bytes, List[int]] = {}
+    tokens: List[Tuple[bytes, int, int, int]] = []
+    for idx, (key, _, _) in enumerate(rows):
+        for g in _record_grams(key):
+            postings.setdefault(g.encode("utf-8"), []).append(idx)
+        raw = key.encode("utf-8")
+        at = 0
+        for tok in raw.split(b" "):
+            tokens.append((tok, idx, at, len(tok)))
+            at += len(tok) + 1
+    tokens.sort()
+
+    gram_table, flat = [], []
+    for g in sorted(postings, key=lambda g: g.ljust(12, b"\0")):
+        gram_table.append(_GRAM.pack(g, len(flat), len(postings[g])))
+        flat.extend(postings[g])
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, len(records), len(gram_table), len(tokens), len(flat)))
+        f.write(_u32_array(offsets))
+        f.writelines(gram_table)
+        f.writelines(_TOKEN.pack(idx, at, n) for _, idx, at, n in tokens)
+        f.write(_u32_array(flat))
+        f.writelines(records)
+    os.replace(tmp, path)
+    return len(records)
+
+
+class PlayerCatalog:
+    """
+    Lê o índice por mmap: registos, trigramas e tokens são consultados diretamente
+    no ficheiro por pesquisa binária, por isso o arranque não depende do tamanho do catálogo.
+    """
+
+    def __init__(self, path: str = CATALOG_FILE):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, self._n_grams, self._n_tokens, n_postings = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} não é um índice de jogadores válido (reconstrói com catalog.py).")
+        self._offsets_at = _HEADER.size
+        self._grams_at = self._offsets_at + _U32.size * self.count
+        self._tokens_at = self._grams_at + _GRAM.size * self._n_grams
+        self._postings_at = self._tokens_at + _TOKEN.size * self._n_tokens
+        self._records_at = self._postings_at + _U32.size * n_postings
+        self._view = memoryview(self._mm)
+        self._common = max(16, int(self.count * COMMON_GRAM_FRACTION))
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _start(self, idx: int) -> int:
+        return self._records_at + _U32.unpack_from(self._mm, self._offsets_at + _U32.size * idx)[0]
+
+    def _key_bytes(self, idx: int) -> bytes:
+        start = self._start(idx)
+        return self._mm[start:self._mm.find(b"\0", start)]
+
+    def _key(self, idx: int) -> str:
+        return self._key_bytes(idx).decode("utf-8")
+
+    def _fields(self, idx: int) -> List[str]:
+        start = end = self._start(idx)
+        for _ in range(3):
+            end = self._mm.find(b"\0", end) + 1
+        return self._mm[start:end - 1].decode("utf-8").split("\0")
+
+    def _entry(self, idx: int, score: float) -> Dict:
+        _, name, pid = self._fields(idx)
+        return {"id": pid, "name": name, "score": round(score, 3)}
+
+    def _token(self, i: int) -> Tuple[bytes, int]:
+        idx, at, n = _TOKEN.unpack_from(self._mm, self._tokens_at + _TOKEN.size * i)
+        start = self._start(idx) + at
+        return self._mm[start:start + n], idx
+
+    def _postings(self, gram: str):
+        """Posting list (ordenada) de um trigrama, lida do mmap; vazia se não existir."""
+        g = gram.encode("utf-8").ljust(12, b"\0")
+        lo, hi = 0, self._n_grams
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if _GRAM.unpack_from(self._mm, self._grams_at + _GRAM.size * mid)[0] < g:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == self._n_grams:
+            return ()
+        found, start, n = _GRAM.unpack_from(self._mm, self._grams_at + _GRAM.size * lo)
+        if found != g:
+            return ()
+        at = self._postings_at + _U32.size * start
+        if sys.byteorder == "little" and array("I").itemsize == 4:
+            return self._view[at:at + _U32.size * n].cast("I")
+        return [v for (v,) in _U32.iter_unpack(self._mm[at:at + _U32.size * n])]
+
+    def prefix(self, query: str, limit: int = 10) -> List[Dict]:
+        """Jogadores cujo nome (ou uma das palavras do nome) começa por `query`."""
+        q = normalize(query).encode("utf-8")
+        if not q:
+            return []
+        found: List[int] = []
+        # nome completo: pesquisa binária sobre os registos
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key_bytes(mid) < q:
+                lo = mid + 1
+            else:
+                hi = mid
+        while lo < self.count and len(found) < limit and self._key_bytes(lo).startswith(q):
+            found.append(lo)
+            lo += 1
+        # palavras soltas ('haal' -> 'erling haaland'): pesquisa binária na tabela de tokens
+        if b" " not in q:
+            lo, hi = 0, self._n_tokens
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if self._token(mid)[0] < q:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            while lo < self._n_tokens and len(found) < limit:
+                tok, idx = self._token(lo)
+                if not tok.startswith(q):
+                    break
+                if idx not in found:
+                    found.append(idx)
+                lo += 1
+        return [self._entry(idx, 1.0) for idx in found]
+
+    def _distance(self, q: str, idx: int, limit: int) -> int:
+        """Menor distância entre a query e o nome, uma palavra ou o início do nome."""
+        key = self._key(idx)
+        best = _edit_distance(q, key, limit)
+        if best and len(key) > len(q):
+            best = min(best, _edit_distance(q, key[:len(q)], limit))
+        for part in key.split():
+            if best == 0 or " " in q:
+                break
+            best = min(best, _edit_distance(q, part, limit))
+        return best
+
+    def search(self, query: str, limit: int = 5, min_score: float = 0.6) -> List[Dict]:
+        """
+        Prefixo primeiro; depois fuzzy por trigramas. Cada edição estraga no máximo
+        3 trigramas, logo um nome a distância <= d partilha >= |G| - 3d - 1 trigramas da query.
+        Só as posting lists raras são percorridas; as comuns entram apenas como majorante.
+        """
+        q = normalize(query)
+        if not q:
+            return []
+        results = self.prefix(q, limit)
+        if len(results) >= limit:
+            return results
+        seen = {r["id"] for r in results}
+
+        max_dist = max(1, len(q) // 4)
+        grams = _trigrams(q)
+        # -1: o trigrama final de um início de nome ('playe ') pode não existir no índice
+        need = len(grams) - 3 * max_dist - 1
+        lists = sorted((self._postings(g) for g in grams), key=len)
+        rare = [p for p in lists if len(p) <= self._common]
+        skipped = len(lists) - len(rare)
+
+        # só as listas raras são percorridas; cada trigrama comum vale no máximo +1
+        hits: Dict[int, int] = {}
+        for p in rare:
+            for idx in p:
+                hits[idx] = hits.get(idx, 0) + 1
+
+        def bound(c: int) -> int:
+            # distância mínima possível para quem partilha c trigramas raros
+            return max(0, -(-(len(grams) - c - skipped - 1) // 3))
+
+        ranked = sorted(((c, idx) for idx, c in hits.items() if c + skipped >= need), reverse=True)
+        candidates: Iterator[Tuple[int, int]] = ((bound(c), idx) for c, idx in ranked)
+        if need - skipped < 1:
+            # um match pode não ter nenhum trigrama raro: pelo princípio do pombal está
+            # numa das len(grams) - need + 1 listas mais curtas (as mais seletivas primeiro)
+            pool = lists[:len(grams) - max(need, 1) + 1]
+            seen_idx = set(hits)
+            extra = (idx for idx in chain.from_iterable(pool)
+                     if idx not in seen_idx and not seen_idx.add(idx))
+            candidates = chain(candidates, ((bound(0), idx) for idx in extra))
+
+        want = limit - len(results)
+        found: List[Tuple[int, int]] = []  # (distância, jogador), ordenado
+        for verified, (lower, idx) in enumerate(candidates):
+            if len(found) >= want and found[want - 1][0] <= lower:
+                break
+            if verified >= MAX_VERIFY:
+                break
+            d = self._distance(q, idx, max_dist)
+            if d <= max_dist:
+                bisect.insort(found, (d, idx))
+
+        for d, idx in found:
+            score = 1.0 - d / len(q)
+            if score < min_score:
+                continue
+            entry = self._entry(idx, score)
+            if entry["id"] not in seen:
+                seen.add(entry["id"])
+                results.append(entry)
+            if len(results) >= limit:
+                break
+        return results
+
+    def resolve(self, name: str) -> Optional[Dict]:
+        hits = self.search(name, limit=1)
+        return hits[0] if hits else None
+
+
+_catalog: Optional[PlayerCatalog] = None
+
+
+def get_catalog(path: str = CATALOG_FILE) -> PlayerCatalog:
+    """Carrega o catálogo uma vez; se o ficheiro não existir, cria-o a partir de SAMPLE_PLAYERS."""
+    global _catalog
+    if _catalog is None:
+        if not os.path.exists(path):
+            from market_analyzer import SAMPLE_PLAYERS
+            build_index(SAMPLE_PLAYERS, path)
+        _catalog = PlayerCatalog(path)
+    return _catalog
+
+
+if __name__ == "__main__":
+    # python catalog.py players.csv [players.idx]   (CSV: id,nome)
+    import csv
+    src = sys.argv[1]
+    dst = sys.argv[2] if len(sys.argv) > 2 else CATALOG_FILE
+    with open(src, newline="", encoding="utf-8") as f:
+        rows = [(r[0], r[1]) for r in csv.reader(f) if len(r) >= 2]
+    print(f"{build_index(rows, dst)} jogadores indexados em {dst}")
@@ -0,0 +1,251 @@
+# detectors.py
+# Detetores de anomalias em streaming (um por jogador / rating de fodder).
+# Cada amostra atualiza o estado em O(1) (mediana: O(log janela)) e o estado
+# é gravado em JSON para sobreviver a reinícios sem reprocessar histórico.
+
+import heapq
+import json
+import math
+import os
+import threading
+from collections import deque
+from typing import Dict, List, Optional
+
+DETECTORS_FILE = os.getenv("DETECTORS_FILE", "detectors.json")
+
+
+class EWMA:
+    """Média/variância exponencialmente ponderadas (atualização incremental tipo Welford)."""
+
+    def __init__(self, alpha: float = 0.1, mean: float = 0.0, var: float = 0.0, n: int = 0):
+        self.alpha, self.mean, self.var, self.n = alpha, mean, var, n
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.var)
+
+    def zscore(self, x: float) -> float:
+        return (x - self.mean) / self.std if self.std > 0 else 0.0
+
+    def update(self, x: float) -> None:
+        self.n += 1
+        if self.n == 1:
+            self.mean, self.var = x, 0.0
+            return
+        diff = x - self.mean
+        incr = self.alpha * diff
+        self.mean += incr
+        self.var = (1 - self.alpha) * (self.var + diff * incr)
+
+    def to_dict(self) -> Dict:
+        return {"alpha": self.alpha, "mean": self.mean, "var": self.var, "n": self.n}
+
+
+class CUSUM:
+    """CUSUM bilateral sobre z-scores: deteta mudanças de regime persistentes."""
+
+    def __init__(self, k: float = 0.5, h: float = 5.0, pos: float = 0.0, neg: float = 0.0):
+        self.k, self.h, self.pos, self.neg = k, h, pos, neg
+
+    def update(self, z: float) -> Optional[str]:
+        self.pos = max(0.0, self.pos + z - self.k)
+        self.neg = max(0.0, self.neg - z - self.k)
+        if self.pos > self.h:
+            self.pos = self.neg = 0.0
+            return "up"
+        if self.neg > self.h:
+            self.pos = self.neg = 0.0
+            return "down"
+        return None
+
+    def to_dict(self) -> Dict:
+        return {"k": self.k, "h": self.h, "pos": self.pos, "neg": self.neg}
+
+
+class RollingMedian:
+    """
+    Mediana numa janela deslizante com dois heaps (max-heap baixo, min-heap alto)
+    e remoção preguiçosa dos valores que saem da janela. Quando os heaps passam de
+    2x a janela são reconstruídos a partir da janela, o que mantém a memória limitada.
+    """
+
+    def __init__(self, window: int = 25, values: Optional[List[float]] = None):
+        self.window = window
+        self.values: deque = deque(maxlen=window)
+        self._low: List[float] = []   # negados
+        self._high: List[float] = []
+        self._delayed: Dict[float, int] = {}
+        self._low_size = self._high_size = 0
+        for v in values or []:
+            self.update(v)
+
+    def _prune(self, heap: List[float], sign: int) -> None:
+        while heap and self._delayed.get(sign * heap[0], 0):
+            v = sign * heapq.heappop(heap)
+            self._delayed[v] -= 1
+            if not self._delayed[v]:
+                del self._delayed[v]
+
+    def _rebalance(self) -> None:
+        if self._low_size > self._high_size + 1:
+            heapq.heappush(self._high, -heapq.heappop(self._low))
+            self._low_size -= 1
+            self._high_size += 1
+            self._prune(self._low, -1)
+        elif self._low_size < self._high_size:
+            heapq.heappush(self._low, -heapq.heappop(self._high))
+            self._low_size += 1
+            self._high_size -= 1
+            self._prune(self._high, 1)
+
+    def _remove(self, v: float) -> None:
+        self._delayed[v] = self._delayed.get(v, 0) + 1
+        if self._low and v <= -self._low[0]:
+            self._low_size -= 1
+            if v == -self._low[0]:
+                self._prune(self._low, -1)
+        else:
+            self._high_size -= 1
+            if self._high and v == self._high[0]:
+                self._prune(self._high, 1)
+        self._rebalance()
+
+    def _compact(self) -> None:
+        ordered = sorted(self.values)
+        half = (len(ordered) + 1) // 2
+        self._low = [-v for v in ordered[:half]]
+        self._high = ordered[half:]
+        heapq.heapify(self._low)
+        heapq.heapify(self._high)
+        self._low_size, self._high_size = len(self._low), len(self._high)
+        self._delayed.clear()
+
+    def update(self, x: float) -> None:
+        if len(self.values) == self.window:
+            self._remove(self.values[0])
+        self.values.append(x)
+        if not self._low or x <= -self._low[0]:
+            heapq.heappush(self._low, -x)
+            self._low_size += 1
+        else:
+            heapq.heappush(self._high, x)
+            self._high_size += 1
+        self._rebalance()
+        if len(self._low) + len(self._high) > 2 * self.window:
+            self._compact()
+
+    @property
+    def median(self) -> Optional[float]:
+        if not self.values:
+            return None
+        if self._low_size > self._high_size:
+            return -self._low[0]
+        return (-self._low[0] + self._high[0]) / 2
+
+    def to_dict(self) -> Dict:
+        return {"window": self.window, "values": list(self.values)}
+
+
+class Detector:
+    """
+    Junta os três detetores para uma série (preço de um jogador ou de um rating).
+    update() devolve a lista de alertas disparados por esta amostra.
+    """
+
+    def __init__(self, key: str, warmup: int = 10, z_threshold: float = 3.0, median_pct: float = 10.0,
+                 ewma: Optional[EWMA] = None, cusum: Optional[CUSUM] = None, median: Optional[RollingMedian] = None):
+        self.key, self.warmup, self.z_threshold, self.median_pct = key, warmup, z_threshold, median_pct
+        self.ewma = ewma or EWMA()
+        self.cusum = cusum or CUSUM()
+        self.median = median or RollingMedian()
+
+    @property
+    def ready(self) -> bool:
+        return self.ewma.n >= self.warmup
+
+    def update(self, x: float) -> List[Dict]:
+        alerts: List[Dict] = []
+        ready = self.ready
+        # compara com o estado *anterior* à amostra
+        z = self.ewma.zscore(x)
+        med = self.median.median
+        if ready:
+            if abs(z) >= self.z_threshold:
+                alerts.append(self._alert("zscore", x, z, med, f"desvio de {z:+.1f}σ face à média ~{int(self.ewma.mean):,}", "alta"))
+            # z limitado: um pico isolado já é reportado pelo z-score, o CUSUM é para desvios persistentes
+            shift = self.cusum.update(max(-self.z_threshold, min(self.z_threshold, z)))
+            if shift:
+                alerts.append(self._alert("cusum", x, z, med, f"mudança de regime ({'subida' if shift == 'up' else 'descida'})", "média"))
+            if med:
+                pct = (x - med) / med * 100.0
+                if abs(pct) >= self.median_pct:
+                    alerts.append(self._alert("median", x, z, med, f"{pct:+.1f}% vs. mediana ~{int(med):,}", "média"))
+        # outliers entram "aparados" na EWMA para um pico isolado não inflacionar a variância
+        if ready and abs(z) >= self.z_threshold:
+            self.ewma.update(self.ewma.mean + math.copysign(self.z_threshold * self.ewma.std, z))
+        else:
+            self.ewma.update(x)
+        self.median.update(x)
+        return alerts
+
+    def _alert(self, kind: str, x: float, z: float, med: Optional[float], detail: str, confidence: str) -> Dict:
+        return {
+            "type": "ANOMALY", "key": self.key, "kind": kind, "value": x,
+            "mean": round(self.ewma.mean, 2), "median": med, "z": round(z, 2),
+            "msg": f"{self.key}: {int(x):,} – {detail}", "confidence": confidence,
+        }
+
+    def to_dict(self) -> Dict:
+        return {
+            "warmup": self.warmup, "z_threshold": self.z_threshold, "median_pct": self.median_pct,
+            "ewma": self.ewma.to_dict(), "cusum": self.cusum.to_dict(), "median": self.median.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, key: str, d: Dict) -> "Detector":
+        return cls(key, d.get("warmup", 10), d.get("z_threshold", 3.0), d.get("median_pct", 10.0),
+                   EWMA(**d["ewma"]), CUSUM(**d["cusum"]), RollingMedian(**d["median"]))
+
+
+class DetectorBank:
+    """
+    Um detetor por chave ('player:<nome>', 'fodder:<rating>'), persistido em JSON.
+    É usado a partir de threads do executor (snapshots), por isso tudo passa por um lock.
+    """
+
+    def __init__(self, path: str = DETECTORS_FILE):
+        self.path = path
+        self.detectors: Dict[str, Detector] = {}
+        self._lock = threading.RLock()
+
+    def get(self, key: str) -> Detector:
+        with self._lock:
+            if key not in self.detectors:
+                self.detectors[key] = Detector(key)
+            return self.detectors[key]
+
+    def update(self, key: str, x: float) -> List[Dict]:
+        with self._lock:
+            return self.get(key).update(float(x))
+
+    def load(self) -> "DetectorBank":
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.detectors = {k: Detector.from_dict(k, d) for k, d in data.items()}
+        except Exception:
+            pass
+        return self
+
+    def save(self) -> None:
+        with self._lock:
+            try:
+                tmp = self.path + ".tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump({k: d.to_dict() for k, d in self.detectors.items()}, f)
+                os.replace(tmp, self.path)
+            except Exception:
+                pass
+
+
+BANK = DetectorBank().load()
@@ -2,6 +2,8 @@ import os, time, json, re, requests
 from bs4 import BeautifulSoup
 from typing import Dict, List, Tuple
 
+from detectors import BANK
+
 # Guardamos leituras recentes para calcular variações
 _cache = {
     "fodder": [],  # [(ts, {83: price, 84: price, 85: price})]
@@ -26,7 +28,7 @@ def _parse_fodder_prices_html(html: str) -> Dict[int, float]:
     text = soup.get_text(" ", strip=True)
 
     # Heurística simples: procurar “84 … 3,200” etc.
-    for rating in (83, 84, 85, 86, 87, 88, 89):
+    for rating in range(80, 92):
         m = re.search(rf"\b{rating}\b[^0-9]{1,10}([0-9][0-9\., ]{{2,}})", text)
         if m:
             val = m.group(1).replace(".", "").replace(",", "").replace(" ", "")
@@ -58,15 +60,15 @@ def pct_change(old: float, new: float) -> float:
     if old is None or old == 0: return 0.0
     return round((new - old) / old * 100.0, 2)
 
-def record_and_compute(platform: str="ps") -> Tuple[Dict[int, float], Dict[int, float], Dict[int, float]]:
+def record_and_compute(platform: str="ps") -> Tuple[Dict[int, float], Dict[int, float], Dict[int, float], List[Dict]]:
     """
     Faz uma leitura, grava no cache e devolve:
-    (preço atual, variação vs. 1h, variação vs. 24h) – se existirem amostras.
+    (preço atual, variação vs. 1h, variação vs. 24h, alertas dos detetores desta leitura).
     """
     now = time.time()
     current = fetch_fodder_snapshot(platform)
     if not current:
-        return {}, {}, {}
+        return {}, {}, {}, []
 
     _cache["fodder"].append((now, current))
     # manter últimas 200 amostras
@@ -81,6 +83,10 @@ def record_and_compute(platform: str="ps") -> Tuple[Dict[int, float], Dict[int,
                 best = (ts, snap)
         return best[1] if best else {}
 
+    # detetores em streaming: um por rating, disparam logo nesta amostra
+    anomalies = [a for r, p in current.items() for a in BANK.update(f"fodder:{r}", p)]
+    BANK.save()
+
     one_h = closest(60*60)
     one_d = closest(24*60*60)
     ch1, ch24 = {}, {}
@@ -88,7 +94,7 @@ def record_and_compute(platform: str="ps") -> Tuple[Dict[int, float], Dict[int,
         ch1[r]  = pct_change(one_h.get(r), p) if one_h else 0.0
         ch24[r] = pct_change(one_d.get(r), p) if one_d else 0.0
 
-    return current, ch1, ch24
+    return current, ch1, ch24, anomalies
 
 def ascii_sparkline(series: List[float], width: int=20) -> str:
     if not series: return ""
@@ -3,6 +3,8 @@ import asyncio, random, statistics, time
 import requests
 from bs4 import BeautifulSoup
 
+from detectors import BANK
+
 USER_AGENT = {"User-Agent":"Mozilla/5.0"}
 
 # Exemplos de endpoints do Futbin (ajusta conforme necessidade)
@@ -38,7 +40,8 @@ def fetch_player_price(player_id: str) -> int | None:
 async def analyze_market(posts: list[str]) -> dict:
     """
     Mistura sinais do X com variações de preço de alguns jogadores.
-    Regra simples (exemplo): se houver leak/hype + preço atual < média N dias => BUY
+    Regra simples (exemplo): se houver leak/hype + preço atual < média EWMA => BUY
+    A média vem do detetor em streaming de cada jogador (ver detectors.py).
     """
     # 1) obter preços (com timeouts)
     prices = []
@@ -49,7 +52,8 @@ async def analyze_market(posts: list[str]) -> dict:
         await asyncio.sleep(0.6)
 
     # 2) fallback se Futbin recusar requests
-    if not prices:
+    synthetic = not prices
+    if synthetic:
         # cria dados sintéticos para não ficar vazio (remove isto quando tiveres endpoints próprios)
         prices = [("Vinícius Jr.", random.randint(8000, 24000)),
                   ("Bukayo Saka", random.randint(9000, 20000)),
@@ -58,21 +62,25 @@ async def analyze_market(posts: list[str]) -> dict:
     # 3) heurística de hype via X
     hype = any(any(k in p.lower() for k in ["leak", "sbc", "promo", "incoming", "mini release"]) for p in posts)
 
-    signals = []
+    signals, anomalies = [], []
     for name, price in prices:
-        # simulamos “média histórica” com var aleatória (troca por histórico real se quiseres)
-        pseudo_mean = int(price * random.uniform(0.95, 1.10))
-        delta = price - pseudo_mean
-        pct = round((delta / pseudo_mean) * 100, 2) if pseudo_mean else 0.0
+        det = BANK.get(f"player:{name}")
+        # média histórica = EWMA antes desta amostra; sem histórico suficiente não há sinal
+        mean = det.ewma.mean if det.ready else None
+        if not synthetic:
+            anomalies.extend(BANK.update(f"player:{name}", price))
+        if not mean:
+            continue
+        pct = round(((price - mean) / mean) * 100, 2)
 
-        if hype and price < pseudo_mean * 0.96:
+        if hype and price < mean * 0.96:
             # BUY
             tp = int(price * 1.18)
             sl = int(price * 0.90)
             signals.append({"player":name, "action":"BUY", "price":price,
                             "reason":"Hype/leak + preço abaixo da média",
                             "tp":tp, "sl":sl, "confidence":min(95, 70 + int(abs(pct)))})
-        elif (not hype) and price > pseudo_mean * 1.07:
+        elif (not hype) and price > mean * 1.07:
             # SELL
             tp = int(price * 0.92)
             sl = int(price * 1.10)
@@ -80,7 +88,9 @@ async def analyze_market(posts: list[str]) -> dict:
                             "reason":"Sem hype + preço acima da média",
                             "tp":tp, "sl":sl, "confidence":min(93, 65 + int(abs(pct)))})
 
-    return {"hype": hype, "prices": prices, "signals": signals}
+    if not synthetic:
+        BANK.save()
+    return {"hype": hype, "prices": prices, "signals": signals, "anomalies": anomalies}
 
 def build_signal_message(result: dict) -> str:
     hype = "Sim" if result.get("hype") else "Não"
@@ -96,4 +106,6 @@ def build_signal_message(result: dict) -> str:
                 f"  Motivo: _{s['reason']}_\n"
                 f"  Confiança: *{s['confidence']}%*\n"
             )
+    for a in result.get("anomalies") or []:
+        lines.append(f"⚠️ {a['msg']}")
     return "\n".join(lines)
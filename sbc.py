@@ -0,0 +1,139 @@
+# sbc.py
+# Solver de SBC: plantel de 11 cartas mais barato que atinge um rating de equipa.
+
+import math
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+SQUAD_SIZE = 11
+MIN_TARGET = 80
+MAX_TARGET = 90
+
+
+def team_rating(ratings: List[int]) -> int:
+    """
+    Rating de equipa segundo a fórmula da EA:
+    - soma dos ratings + correção acima da média (soma de r - média para r > média)
+    - arredonda o total ajustado e divide por 11 (arredondado para baixo)
+    """
+    if len(ratings) != SQUAD_SIZE:
+        raise ValueError(f"São precisas {SQUAD_SIZE} cartas, recebi {len(ratings)}.")
+    counts: Dict[int, int] = {}
+    for r in ratings:
+        counts[r] = counts.get(r, 0) + 1
+    return _counts_rating(list(counts.items()))
+
+
+def _counts_rating(counts: List[Tuple[int, int]]) -> int:
+    """Igual a team_rating, mas recebe [(rating, quantidade)]."""
+    total = sum(r * n for r, n in counts)
+    avg = total / SQUAD_SIZE
+    excess = sum((r - avg) * n for r, n in counts if r > avg)
+    # arredondamento a 2 casas evita erros de vírgula flutuante (ex.: 934.4999…)
+    return int(math.floor(round(total + excess, 2) + 0.5)) // SQUAD_SIZE
+
+
+def _useful_ratings(prices: Dict[int, float]) -> List[Tuple[int, float]]:
+    """
+    Remove ratings dominados: se um rating mais alto custa o mesmo ou menos,
+    nunca compensa usar o mais baixo (o rating de equipa é monótono).
+    Devolve [(rating, preço)] por rating decrescente.
+    """
+    out: List[Tuple[int, float]] = []
+    cheapest_above = math.inf
+    for r in sorted(prices, reverse=True):
+        p = prices[r]
+        if p is None or p <= 0:
+            continue
+        if p < cheapest_above:
+            out.append((r, float(p)))
+            cheapest_above = p
+    return out
+
+
+@lru_cache(maxsize=512)
+def _solve_cached(prices_key: Tuple[Tuple[int, float], ...], target: int) -> Optional[Tuple[Tuple[int, int], ...]]:
+    """
+    Branch-and-bound sobre a quantidade de cartas de cada rating (do mais alto
+    para o mais baixo). Cortes:
+    - custo: custo atual + slots restantes * preço mais barato ainda disponível
+    - viabilidade: nem preenchendo o resto com o rating mais alto restante se atinge o alvo
+    """
+    options = _useful_ratings(dict(prices_key))
+    if not options:
+        return None
+    k = len(options)
+    # mais barato entre as opções i..k-1 (as opções estão por rating decrescente,
+    # logo o preço é crescente; mas calculamos à mesma por segurança)
+    min_price_from = [math.inf] * (k + 1)
+    for i in range(k - 1, -1, -1):
+        min_price_from[i] = min(options[i][1], min_price_from[i + 1])
+
+    # limite inicial: 11 cartas iguais do rating >= alvo mais barato
+    best_cost = math.inf
+    best: Optional[List[Tuple[int, int]]] = None
+    for r, p in options:
+        if r >= target and SQUAD_SIZE * p < best_cost:
+            best_cost = SQUAD_SIZE * p
+            best = [(r, SQUAD_SIZE)]
+    chosen: List[Tuple[int, int]] = []
+
+    def dfs(i: int, left: int, cost: float) -> None:
+        nonlocal best_cost, best
+        if left == 0:
+            if cost < best_cost and _counts_rating(chosen) >= target:
+                best_cost = cost
+                best = list(chosen)
+            return
+        if i >= k:
+            return
+        if cost + left * min_price_from[i] >= best_cost:
+            return
+        # viabilidade: o melhor possível é preencher tudo com options[i]
+        if _counts_rating(chosen + [(options[i][0], left)]) < target:
+            return
+        rating, price = options[i]
+        # última opção tem de levar todos os slots restantes
+        lo = left if i == k - 1 else 0
+        for n in range(left, lo - 1, -1):
+            if n:
+                chosen.append((rating, n))
+            dfs(i + 1, left - n, cost + n * price)
+            if n:
+                chosen.pop()
+
+    dfs(0, SQUAD_SIZE, 0.0)
+    return tuple(best) if best is not None else None
+
+
+def solve_sbc(prices: Dict[int, float], target: int) -> Dict:
+    """
+    Devolve o mix de ratings mais barato para atingir `target` com os preços dados
+    ({rating: preço}, como em market.fetch_fodder_snapshot).
+    Resultados ficam em cache por snapshot (mesmos preços + alvo => sem recalcular).
+    """
+    if not (MIN_TARGET <= target <= MAX_TARGET):
+        raise ValueError(f"Rating alvo deve estar entre {MIN_TARGET} e {MAX_TARGET}.")
+    key = tuple(sorted((int(r), float(p)) for r, p in prices.items() if p))
+    mix = _solve_cached(key, target)
+    if mix is None:
+        return {"ok": False, "target": target, "detail": "Sem fodder suficiente para atingir o rating."}
+    price_of = dict(key)
+    ratings = [r for r, n in mix for _ in range(n)]
+    return {
+        "ok": True,
+        "target": target,
+        "rating": team_rating(ratings),
+        "cost": int(sum(price_of[r] * n for r, n in mix)),
+        "mix": [{"rating": r, "count": n, "price": int(price_of[r])} for r, n in mix],
+    }
+
+
+def format_solution(result: Dict) -> str:
+    if not result.get("ok"):
+        return f"🧩 SBC {result.get('target')}: {result.get('detail', 'sem solução')}"
+    lines = [f"🧩 SBC {result['target']} – custo mínimo ~{result['cost']:,} moedas"]
+    for m in result["mix"]:
+        lines.append(f"• {m['count']}x {m['rating']} @ {m['price']:,}")
+    lines.append(f"Rating final: {result['rating']}")
+    return "\n".join(lines)
@@ -0,0 +1,123 @@
+# snapshots.py
+# Resultados pré-calculados de cada ciclo, servidos da memória (JSON já serializado + ETag).
+
+import asyncio
+import hashlib
+import json
+import time
+from dataclasses import asdict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class Snapshot:
+    """
+    Guarda o último resultado de uma computação (scan, fodder, hype) já em bytes JSON.
+    - refresh() é single-flight: pedidos concorrentes durante um refresh partilham
+      a mesma computação em curso (nunca há scrapes duplicados).
+    - Se a computação falhar, mantém-se o último resultado bom; sem resultado bom,
+      get() não volta a tentar antes de `retry_after` segundos (o refresh agendado
+      tenta sempre).
+    """
+
+    def __init__(self, name: str, compute: Callable[[], Any], retry_after: float = 60.0):
+        self.name = name
+        self.compute = compute
+        self.data: Any = None
+        self.body: Optional[bytes] = None
+        self.etag: Optional[str] = None
+        self.updated_at: Optional[float] = None
+        self.error: Optional[str] = None
+        self.failed_at: Optional[float] = None
+        self.retry_after = retry_after
+        self._inflight: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            data = await loop.run_in_executor(None, self.compute)
+            payload = json.dumps(data, ensure_ascii=False, default=str, sort_keys=True)
+            # ETag fraco: só depende dos dados (exclui updated_at), por isso se nada
+            # mudou entre ciclos os clientes continuam a receber 304
+            etag = 'W/"' + hashlib.sha1(payload.encode("utf-8")).hexdigest()[:20] + '"'
+            now = time.time()
+            body = f'{{"name": {json.dumps(self.name)}, "updated_at": {now}, "data": {payload}}}'
+            self.data, self.body, self.etag, self.updated_at = data, body.encode("utf-8"), etag, now
+            self.error, self.failed_at = None, None
+        except Exception as e:
+            self.error, self.failed_at = str(e), time.monotonic()
+        finally:
+            self._inflight = None
+
+    async def refresh(self) -> None:
+        if self._inflight is None:
+            self._inflight = asyncio.get_running_loop().create_task(self._run())
+        # shield: um cliente que desiste não cancela a computação dos restantes
+        await asyncio.shield(self._inflight)
+
+    async def get(self) -> Tuple[Optional[bytes], Optional[str]]:
+        """Devolve (body, etag); só calcula se ainda não existir nenhum resultado."""
+        if self.body is None and self.retry_in() == 0:
+            await self.refresh()
+        return self.body, self.etag
+
+
+    def retry_in(self) -> float:
+        """Segundos até get() poder voltar a tentar depois de uma falha (0 = já pode)."""
+        if self.failed_at is None:
+            return 0.0
+        return max(0.0, self.retry_after - (time.monotonic() - self.failed_at))
+
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def etag_matches(if_none_match: Optional[str], etag: Optional[str]) -> bool:
+    """Comparação fraca (RFC 9110), a usada para If-None-Match."""
+    if not if_none_match or not etag:
+        return False
+    for tag in if_none_match.split(","):
+        if tag.strip() == "*" or _opaque(tag) == _opaque(etag):
+            return True
+    return False
+
+
+def _compute_signals() -> Dict[str, Any]:
+    from analyzer import scan_cycle
+    cycle = scan_cycle()
+    return {"signals": cycle["signals"], "late": cycle["late"]}
+
+
+def _compute_fodder() -> Dict[str, Any]:
+    from market import record_and_compute
+    current, ch1, ch24, anomalies = record_and_compute()
+    if not current:
+        # leitura vazia = scrape falhou; mantém-se o último snapshot bom
+        raise RuntimeError("Preços de fodder indisponíveis.")
+    return {"prices": current, "change_1h": ch1, "change_24h": ch24, "anomalies": anomalies}
+
+
+def _compute_hype() -> Dict[str, Any]:
+    from sources import fetch_rss
+    return {"items": [asdict(i) for i in fetch_rss()]}
+
+
+def _compute_players() -> Dict[str, Any]:
+    # corre na thread do executor: analyze_market é async, por isso tem o seu próprio loop
+    from market_analyzer import analyze_market
+    items = (HYPE.data or {}).get("items") or []
+    posts = [f"{i.get('title', '')} {i.get('summary', '')}" for i in items]
+    return asyncio.run(analyze_market(posts))
+
+
+SIGNALS = Snapshot("signals", _compute_signals)
+FODDER = Snapshot("fodder", _compute_fodder)
+HYPE = Snapshot("hype", _compute_hype)
+PLAYERS = Snapshot("players", _compute_players)
+
+
+async def refresh_all() -> None:
+    await asyncio.gather(SIGNALS.refresh(), FODDER.refresh(), HYPE.refresh())
+    # jogadores depois do hype: analyze_market usa os posts do ciclo atual
+    await PLAYERS.refresh()